@@ -10,11 +10,124 @@ Features:
 - Support for custom texture themes (medieval, tech, etc.)
 """
 
+import hashlib
+import io
+import mmap
+import os
+import pickle
 import random
 import math
+import sys
+import tempfile
+
+# Brush with all six faces sharing one texture. Fields:
+# 0-5 = x1 y1 z1 x2 y2 z2, 6-8 = x1+1 y1+1 z1+1, 9 = texture
+_WALL_BRUSH_TMPL = (
+    '{{\n'
+    '( {0} {1} {2} ) ( {0} {7} {2} ) ( {0} {1} {8} ) {9} 0 0 0 1 1\n'  # West
+    '( {3} {1} {2} ) ( {3} {1} {8} ) ( {3} {7} {2} ) {9} 0 0 0 1 1\n'  # East
+    '( {0} {1} {2} ) ( {0} {1} {8} ) ( {6} {1} {2} ) {9} 0 0 0 1 1\n'  # South
+    '( {0} {4} {2} ) ( {6} {4} {2} ) ( {0} {4} {8} ) {9} 0 0 0 1 1\n'  # North
+    '( {0} {1} {2} ) ( {6} {1} {2} ) ( {0} {7} {2} ) {9} 0 0 0 1 1\n'  # Bottom
+    '( {0} {1} {5} ) ( {0} {7} {5} ) ( {6} {1} {5} ) {9} 0 0 0 1 1\n'  # Top
+    '}}\n'
+)
+
+# Box brush with separate side, bottom and top textures. Fields:
+# 0-5 = x1 y1 z1 x2 y2 z2, 6-8 = x1+1 y1+1 z1+1, 9 = sides, 10 = bottom, 11 = top
+_BRUSH_TMPL = (
+    '{{\n'
+    '( {0} {1} {2} ) ( {0} {7} {2} ) ( {0} {1} {8} ) {9} 0 0 0 1 1\n'   # West
+    '( {3} {1} {2} ) ( {3} {1} {8} ) ( {3} {7} {2} ) {9} 0 0 0 1 1\n'   # East
+    '( {0} {1} {2} ) ( {0} {1} {8} ) ( {6} {1} {2} ) {9} 0 0 0 1 1\n'   # South
+    '( {0} {4} {2} ) ( {6} {4} {2} ) ( {0} {4} {8} ) {9} 0 0 0 1 1\n'   # North
+    '( {0} {1} {2} ) ( {6} {1} {2} ) ( {0} {7} {2} ) {10} 0 0 0 1 1\n'  # Bottom
+    '( {0} {1} {5} ) ( {0} {7} {5} ) ( {6} {1} {5} ) {11} 0 0 0 1 1\n'  # Top
+    '}}\n'
+)
+
+# Wedge brush for ramps: box faces with a top plane sloping up along Y. Fields:
+# 0-2 = x1 y1 z1, 3-4 = x2 y2, 5 = z1 + rise, 6-8 = x1+1 y1+1 z1+1,
+# 9 = side/bottom texture, 10 = sloped top texture
+_RAMP_BRUSH_TMPL = (
+    '{{\n'
+    '( {0} {1} {2} ) ( {0} {7} {2} ) ( {0} {1} {8} ) {9} 0 0 0 1 1\n'   # West (vertical)
+    '( {3} {1} {2} ) ( {3} {1} {8} ) ( {3} {7} {2} ) {9} 0 0 0 1 1\n'   # East (vertical)
+    '( {0} {1} {2} ) ( {0} {1} {8} ) ( {6} {1} {2} ) {9} 0 0 0 1 1\n'   # South (low end)
+    '( {0} {4} {2} ) ( {6} {4} {2} ) ( {0} {4} {5} ) {9} 0 0 0 1 1\n'   # North (high end)
+    '( {0} {1} {2} ) ( {6} {1} {2} ) ( {0} {7} {2} ) {9} 0 0 0 1 1\n'   # Bottom (flat)
+    '( {0} {1} {2} ) ( {0} {4} {5} ) ( {6} {1} {2} ) {10} 0 0 0 1 1\n'  # Top (sloped ramp surface)
+    '}}\n'
+)
+
+# Worldspawn opener with the fixed map-wide settings
+_WORLDSPAWN_HEADER = (
+    '// Game: Quake\n'
+    '// Format: Standard\n'
+    '// entity 0\n'
+    '{\n'
+    '"message" "Deep Below The Ground..."\n'
+    '"mapversion" "220"\n'
+    '"sounds" "3"\n'
+    '"_fog" "0.045 0.1 0.3 0.6"\n'
+    '"_skyfog" ".2"\n'
+    '"_telealpha" "1"\n'
+    '"_wateralpha" "0.6"\n'
+    '"_slimealpha" "0.8"\n'
+    '"_lavaalpha" "1"\n'
+    '"_sunlight" "200"\n'
+    '"_sunlight2" "150"\n'
+    '"_sunlight_color" "1 1 1"\n'
+    '"_sun_mangle" "135 -65 0"\n'
+    '"_sunlight_penumbra" "8"\n'
+    '"_light" "32"\n'
+    '"_bounce" "1"\n'
+    '"_dirt" "1"\n'
+    '"_dirtgain" "0.6"\n'
+    '"_dirtdepth" "64"\n'
+    '"classname" "worldspawn"\n'
+)
+
+# Light entity: number, x, y, z, brightness, optional "_color" line
+_LIGHT_TMPL = '// entity {0}\n{{\n"classname" "light"\n"origin" "{1} {2} {3}"\n"light" "{4}"\n{5}}}\n'
+
+# Point entity block for spawned items/monsters: number, classname, origin
+_ENTITY_TMPL = '// entity %d\n{\n"classname" "%s"\n"origin" "%s"\n}\n'
+
+# Generator state that makes up a placed layout (see generate(cache_dir=...))
+_LAYOUT_STATE_ATTRS = ('grid', 'rooms', 'doors', 'teleporters',
+                       'vertical_connections', 'end_goal', 'last_theme')
+
+# Part of every layout cache key; bump it when the layout state changes shape
+_LAYOUT_CACHE_VERSION = 1
+
+# Map files at least this large are written through a memory-mapped file
+_MMAP_WRITE_THRESHOLD = 4 << 20
+
+
+def _write_file_bytes(filename, data):
+    """Write an encoded map to disk in one pass
+
+    Small maps go straight to an unbuffered file, so the bytes are not first
+    copied into a write buffer. Large maps (big grids) preallocate the file
+    at its final size and copy the bytes into an mmap of it, avoiding an
+    extra copy through the kernel write buffers.
+    """
+    if len(data) < _MMAP_WRITE_THRESHOLD:
+        with open(filename, 'wb', buffering=0) as out:
+            # Raw writes may be partial; keep going until everything is out
+            view = memoryview(data)
+            while view:
+                view = view[out.write(view):]
+        return
+
+    with open(filename, 'w+b') as out:
+        out.truncate(len(data))
+        with mmap.mmap(out.fileno(), len(data)) as mm:
+            mm[:] = data
 
 class QuakeDungeonGenerator:
-    def __init__(self, grid_size=10, room_min=12, room_max=20, num_rooms=18, texture_variety=True, wad_path="id.wad", spawn_entities=True, spawn_chance=1, num_levels=2, upper_room_chance=0.3):
+    def __init__(self, grid_size=10, room_min=12, room_max=20, num_rooms=18, texture_variety=True, wad_path="id.wad", spawn_entities=True, spawn_chance=1, num_levels=2, upper_room_chance=0.3, texture_pools=None):
         """
         grid_size: Size of the grid (grid_size x grid_size cells)
         room_min/max: Min and max room dimensions in grid cells
@@ -29,6 +142,8 @@ class QuakeDungeonGenerator:
         spawn_chance: Probability (0-1) that a room will have entity spawns
         num_levels: Number of vertical levels in the dungeon (2+ for multi-level support)
         upper_room_chance: Probability (0-1) that a ground-level room will have stairs to an upper level
+        texture_pools: Optional dict of surface type -> texture list replacing the
+                       default pools, same as calling set_texture_pool() for each
         """
         self.grid_size = grid_size
         self.room_min = room_min
@@ -384,6 +499,18 @@ class QuakeDungeonGenerator:
             ],
         }
 
+        # Custom pools replace the defaults in one pass, before the fixed
+        # per-run textures below are derived from them
+        if texture_pools:
+            for texture_type, textures in texture_pools.items():
+                self.texture_pools[texture_type] = self._normalize_pool(texture_type, textures)
+
+        # Fixed per-run textures used when texture_variety is False
+        # (kept in sync with the pools by set_texture_pool)
+        self._tex_floor_const = self.texture_pools['floor'][0]
+        self._tex_wall_const = self.texture_pools['wall'][0]
+        self._tex_ceiling_const = self.texture_pools['ceiling'][0]
+
         # Entity pools for spawning in rooms
         self.entity_pools = {
             'weapons': [
@@ -971,7 +1098,7 @@ class QuakeDungeonGenerator:
         for type_name, type_data in self.room_types.items():
             self.room_type_names.append(type_name)
             self.room_type_weights.append(type_data['weight'])
-        
+
     def _choose_next_theme(self):
         """Choose a theme for the next room with smooth transitions
 
@@ -1039,20 +1166,7 @@ class QuakeDungeonGenerator:
 
     def _write_simple_brush(self, f, x1, y1, z1, x2, y2, z2, texture):
         """Writes a simple brush where all faces have the same texture."""
-        f.write('{\n')
-        # West face
-        f.write(f'( {x1} {y1} {z1} ) ( {x1} {y1+1} {z1} ) ( {x1} {y1} {z1+1} ) {texture} 0 0 0 1 1\n')
-        # East face
-        f.write(f'( {x2} {y1} {z1} ) ( {x2} {y1} {z1+1} ) ( {x2} {y1+1} {z1} ) {texture} 0 0 0 1 1\n')
-        # South face
-        f.write(f'( {x1} {y1} {z1} ) ( {x1} {y1} {z1+1} ) ( {x1+1} {y1} {z1} ) {texture} 0 0 0 1 1\n')
-        # North face
-        f.write(f'( {x1} {y2} {z1} ) ( {x1+1} {y2} {z1} ) ( {x1} {y2} {z1+1} ) {texture} 0 0 0 1 1\n')
-        # Bottom face
-        f.write(f'( {x1} {y1} {z1} ) ( {x1+1} {y1} {z1} ) ( {x1} {y1+1} {z1} ) {texture} 0 0 0 1 1\n')
-        # Top face
-        f.write(f'( {x1} {y1} {z2} ) ( {x1} {y1+1} {z2} ) ( {x1+1} {y1} {z2} ) {texture} 0 0 0 1 1\n')
-        f.write('}\n')
+        f.write(_WALL_BRUSH_TMPL.format(x1, y1, z1, x2, y2, z2, x1 + 1, y1 + 1, z1 + 1, texture))
 
     def _get_room_floor_offset(self, room):
         """Get the floor Z offset for a room based on its type
@@ -1376,28 +1490,10 @@ class QuakeDungeonGenerator:
         wall_texture = room.get('wall_texture', 'metal2_1')
 
         # Write ramp brush with angled top face
-        f.write('{\n')
-
-        # West face (vertical)
-        f.write(f'( {ramp_x1} {ramp_y1} {base_floor_z} ) ( {ramp_x1} {ramp_y1+1} {base_floor_z} ) ( {ramp_x1} {ramp_y1} {base_floor_z+1} ) {wall_texture} 0 0 0 1 1\n')
-
-        # East face (vertical)
-        f.write(f'( {ramp_x2} {ramp_y1} {base_floor_z} ) ( {ramp_x2} {ramp_y1} {base_floor_z+1} ) ( {ramp_x2} {ramp_y1+1} {base_floor_z} ) {wall_texture} 0 0 0 1 1\n')
-
-        # South face (low end, vertical)
-        f.write(f'( {ramp_x1} {ramp_y1} {base_floor_z} ) ( {ramp_x1} {ramp_y1} {base_floor_z+1} ) ( {ramp_x1+1} {ramp_y1} {base_floor_z} ) {wall_texture} 0 0 0 1 1\n')
-
-        # North face (high end, vertical from base to top)
-        f.write(f'( {ramp_x1} {ramp_y2} {base_floor_z} ) ( {ramp_x1+1} {ramp_y2} {base_floor_z} ) ( {ramp_x1} {ramp_y2} {base_floor_z + ramp_rise} ) {wall_texture} 0 0 0 1 1\n')
-
-        # Bottom face (flat, horizontal)
-        f.write(f'( {ramp_x1} {ramp_y1} {base_floor_z} ) ( {ramp_x1+1} {ramp_y1} {base_floor_z} ) ( {ramp_x1} {ramp_y1+1} {base_floor_z} ) {wall_texture} 0 0 0 1 1\n')
-
-        # Top face (SLOPED - this is the ramp surface)
-        # Three points: low end (y1), high end (y2 at +rise), and offset point
-        f.write(f'( {ramp_x1} {ramp_y1} {base_floor_z} ) ( {ramp_x1} {ramp_y2} {base_floor_z + ramp_rise} ) ( {ramp_x1+1} {ramp_y1} {base_floor_z} ) {floor_texture} 0 0 0 1 1\n')
-
-        f.write('}\n')
+        f.write(_RAMP_BRUSH_TMPL.format(ramp_x1, ramp_y1, base_floor_z,
+                                        ramp_x2, ramp_y2, base_floor_z + ramp_rise,
+                                        ramp_x1 + 1, ramp_y1 + 1, base_floor_z + 1,
+                                        wall_texture, floor_texture))
 
     def _add_balcony_to_room(self, f, room):
         """Add a balcony/second floor to a two-story room
@@ -1584,8 +1680,98 @@ class QuakeDungeonGenerator:
         # Store hole bounds in room for later use during floor generation
         room['floor_hole_bounds'] = hole_bounds
 
-    def generate(self):
-        """Generate the dungeon layout with multi-level support"""
+    def generate(self, seed=None, cache_dir=None):
+        """Generate the dungeon layout with multi-level support
+
+        Args:
+            seed: Optional seed for the random module, making the layout reproducible.
+                  A seeded layout's textures are picked from the current pools
+                  once it is placed (see restamp_textures).
+            cache_dir: Optional directory (e.g. ~/.cache/quake-gen) for caching
+                       seeded layouts. A layout already generated with the same
+                       seed and layout settings is loaded instead of placed again.
+                       The exported map is the same with or without the cache.
+                       Ignored without a seed.
+                       Cache files are pickles: only point this at a directory
+                       you trust, since loading a pickle can run arbitrary code.
+        """
+        if seed is None:
+            self._generate_layout()
+            return
+
+        random.seed(seed)
+
+        state = None
+        if cache_dir is not None:
+            cache_dir = os.path.expanduser(cache_dir)
+            cache_path = self._layout_cache_path(cache_dir, seed)
+            state = self._load_layout_cache(cache_path)
+
+        if state is not None:
+            # Resume the RNG where the cached run left it after placing the layout
+            random.setstate(state.pop('random_state'))
+            for attr, value in state.items():
+                setattr(self, attr, value)
+            print(f"Loaded cached layout: {cache_path}")
+        else:
+            self._generate_layout()
+            if cache_dir is not None:
+                self._save_layout_cache(cache_dir, cache_path)
+
+        # Every seeded run, cached or not, ends by picking its textures here
+        self.restamp_textures()
+
+    def _layout_cache_path(self, cache_dir, seed):
+        """Cache file for a seeded layout, keyed by the settings that shape it"""
+        key = repr((_LAYOUT_CACHE_VERSION, self.grid_size, self.room_min, self.room_max,
+                    self.num_rooms, self.num_levels, self.upper_room_chance,
+                    self.texture_variety, seed))
+        return os.path.join(cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pkl')
+
+    def _load_layout_cache(self, cache_path):
+        """Load a cached layout state, or return None to place the layout again"""
+        try:
+            with open(cache_path, 'rb') as cached:
+                state = pickle.load(cached)
+        except Exception:
+            # A missing, truncated or otherwise unreadable cache file is a miss
+            return None
+        if not isinstance(state, dict) or set(state) != {*_LAYOUT_STATE_ATTRS, 'random_state'}:
+            return None
+        return state
+
+    def _save_layout_cache(self, cache_dir, cache_path):
+        """Write the current layout and RNG state to the cache
+
+        The state is written to a temporary file in cache_dir and renamed into
+        place, so a concurrent or interrupted run never sees a partial file.
+        """
+        state = {attr: getattr(self, attr) for attr in _LAYOUT_STATE_ATTRS}
+        state['random_state'] = random.getstate()
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile('wb', dir=cache_dir, suffix='.tmp', delete=False) as tmp:
+            try:
+                pickle.dump(state, tmp)
+            except BaseException:
+                tmp.close()
+                os.unlink(tmp.name)
+                raise
+        os.replace(tmp.name, cache_path)
+
+    def restamp_textures(self):
+        """Re-pick every room and door texture from the current pools and themes
+
+        The geometry is left untouched, so a cached or already generated
+        layout can be exported again with a different texture set.
+        """
+        for room in self.rooms:
+            self._assign_room_textures(room)
+        door_pool = self.texture_pools['door']
+        for door in self.doors:
+            door['texture'] = random.choice(door_pool)
+
+    def _generate_layout(self):
+        """Place rooms, stairs, doors and teleporters for a new layout"""
         # Phase 1: Generate ground-level rooms (level 0)
         ground_rooms = []
         for i in range(self.num_rooms):
@@ -1679,10 +1865,7 @@ class QuakeDungeonGenerator:
 
             # Check if space is free
             if self._is_space_free(x, y, width, height, level):
-                # Mark space as occupied
-                for dy in range(height):
-                    for dx in range(width):
-                        self.grid[level][y + dy][x + dx] = True
+                self._mark_space_occupied(x, y, width, height, level)
 
                 return {
                     'x': x,
@@ -1700,12 +1883,18 @@ class QuakeDungeonGenerator:
         if x + width > self.grid_size or y + height > self.grid_size:
             return False
 
-        for dy in range(height):
-            for dx in range(width):
-                if self.grid[level][y + dy][x + dx]:
-                    return False
+        # Scan whole row spans at once instead of testing cell by cell
+        for row in self.grid[level][y:y + height]:
+            if True in row[x:x + width]:
+                return False
         return True
 
+    def _mark_space_occupied(self, x, y, width, height, level=0):
+        """Mark a rectangular space as occupied at specified level"""
+        span = [True] * width
+        for row in self.grid[level][y:y + height]:
+            row[x:x + width] = span
+
     def _place_upper_room_above(self, lower_room, upper_level):
         """Place an upper-level room above a lower room with stairs
 
@@ -1737,10 +1926,7 @@ class QuakeDungeonGenerator:
 
             # Check if space is free
             if self._is_space_free(x, y, width, height, upper_level):
-                # Mark space as occupied
-                for dy in range(height):
-                    for dx in range(width):
-                        self.grid[upper_level][y + dy][x + dx] = True
+                self._mark_space_occupied(x, y, width, height, upper_level)
 
                 upper_room = {
                     'x': x,
@@ -1941,7 +2127,6 @@ class QuakeDungeonGenerator:
 
                 # If all checks pass, create the door.
                 self.doors.append({
-                    'origin': f"{door_x} {door_y} {self.floor_height + 64}",
                     'angle': -1, # Slide up
                     'texture': random.choice(self.texture_pools['door']),
                     'position': (door_x, door_y),
@@ -2121,12 +2306,71 @@ class QuakeDungeonGenerator:
 
         Args:
             texture_type: One of 'floor', 'ceiling', or 'wall'
-            textures: List of texture names to use
+            textures: List of texture names to use. Names are interned and
+                      exact repeats are dropped; names differing only in case
+                      are kept (they are distinct textures to the map compiler)
         """
-        if texture_type in self.texture_pools and textures:
-            self.texture_pools[texture_type] = textures
-        else:
+        textures = self._normalize_pool(texture_type, textures)
+        self.texture_pools[texture_type] = textures
+        if texture_type in ('floor', 'wall', 'ceiling'):
+            setattr(self, f'_tex_{texture_type}_const', textures[0])
+
+    def _normalize_pool(self, texture_type, textures):
+        """Validate a custom texture pool and return it ready for use
+
+        Names are interned and exact repeats are dropped, keeping first-seen
+        order.
+
+        Args:
+            texture_type: Surface type the pool replaces
+            textures: List of texture names
+
+        Returns:
+            New list of texture names
+
+        Raises:
+            ValueError: If texture_type is unknown or textures is empty
+        """
+        if texture_type not in self.texture_pools or not textures:
             raise ValueError(f"Invalid texture_type '{texture_type}' or empty texture list")
+        return list(dict.fromkeys(map(sys.intern, textures)))
+
+    def _prepare_entity_pools(self):
+        """Rebuild the flattened entity pools from the current entity_pools
+
+        Each room then draws all of its spawns with a single random.choices()
+        call. Called once per export, so changes made to entity_pools after
+        construction are picked up.
+        """
+        self._additional_pool = self._flatten_entity_pools(list(self.entity_pools.keys()))
+        self._supply_pool = self._flatten_entity_pools(['weapons', 'ammo', 'health', 'armor'])
+        self._minimal_item_pool = self._flatten_entity_pools(['ammo', 'health'])
+
+    def _flatten_entity_pools(self, categories):
+        """Flatten several entity pools into one weighted pool
+
+        Each category gets the same total weight, split evenly across its
+        entities, so one weighted draw matches picking a category uniformly
+        and then an entity uniformly from it. Empty categories are left out.
+
+        Args:
+            categories: List of entity_pools keys to combine
+
+        Returns:
+            Tuple of (entity_classes, cum_weights) suitable for random.choices()
+        """
+        pools = [self.entity_pools[category] for category in categories]
+        pools = [pool for pool in pools if pool]
+        entity_classes = []
+        cum_weights = []
+        total = 0.0
+        for pool in pools:
+            weight = 1.0 / (len(pools) * len(pool))
+            for entity_class in pool:
+                total += weight
+                entity_classes.append(entity_class)
+                cum_weights.append(total)
+        return entity_classes, cum_weights
 
     def _spawn_room_entities(self, room, entity_num):
         """Spawn entities in a room based on room type
@@ -2141,6 +2385,12 @@ class QuakeDungeonGenerator:
         """
         entities = []
 
+        # Bind hot lookups to locals for the spawn loops below
+        rc = random.choice
+        rcs = random.choices
+        ri = random.randint
+        pools = self.entity_pools
+
         # Get room type information
         room_type_name = room.get('type', 'plain')
         room_type = self.room_types.get(room_type_name, self.room_types['plain'])
@@ -2159,16 +2409,16 @@ class QuakeDungeonGenerator:
         room_x2 -= padding
         room_y2 -= padding
 
+        # Account for room level
+        room_level = room.get('level', 0)
+        level_z_offset = room_level * self.level_height
+        z = self.floor_height + level_z_offset + 24
+
         # Helper function to spawn an entity at random position
         def spawn_entity(classname):
             nonlocal entity_num
-            x = random.randint(int(room_x1), int(room_x2))
-            y = random.randint(int(room_y1), int(room_y2))
-
-            # Account for room level
-            room_level = room.get('level', 0)
-            level_z_offset = room_level * self.level_height
-            z = self.floor_height + level_z_offset + 24
+            x = ri(room_x1, room_x2)
+            y = ri(room_y1, room_y2)
 
             entities.append({
                 'num': entity_num,
@@ -2184,60 +2434,51 @@ class QuakeDungeonGenerator:
 
         elif entity_mode == 'supplies_only':
             # Safe room - only items, no monsters
-            num_items = random.randint(3, 6)
-            supply_categories = ['weapons', 'ammo', 'health', 'armor']
-            for _ in range(num_items):
-                category = random.choice(supply_categories)
-                entity_class = random.choice(self.entity_pools[category])
+            num_items = ri(3, 6)
+            supply_classes, supply_weights = self._supply_pool
+            for entity_class in rcs(supply_classes, cum_weights=supply_weights, k=num_items):
                 spawn_entity(entity_class)
 
         elif entity_mode == 'minimal':
             # Small room - maybe one monster or one item
             if random.random() < 0.5:
-                monster_class = random.choice(self.entity_pools['monsters'])
+                monster_class = rc(pools['monsters'])
                 spawn_entity(monster_class)
             else:
-                category = random.choice(['ammo', 'health'])
-                entity_class = random.choice(self.entity_pools[category])
-                spawn_entity(entity_class)
+                item_classes, item_weights = self._minimal_item_pool
+                spawn_entity(rcs(item_classes, cum_weights=item_weights)[0])
 
         elif entity_mode == 'ambush':
             # Ambush - many monsters
             multiplier = room_type.get('entity_multiplier', 2.5)
-            num_monsters = int(random.randint(2, 4) * multiplier)
-            for _ in range(num_monsters):
-                monster_class = random.choice(self.entity_pools['monsters'])
+            num_monsters = int(ri(2, 4) * multiplier)
+            for monster_class in rcs(pools['monsters'], k=num_monsters):
                 spawn_entity(monster_class)
 
         elif entity_mode == 'horde':
             # Horde - many weak monsters
-            num_monsters = random.randint(5, 8)
+            num_monsters = ri(5, 8)
             weak_monsters = ['monster_army', 'monster_dog', 'monster_zombie', 'monster_grunt']
-            for _ in range(num_monsters):
-                monster_class = random.choice(weak_monsters)
+            for monster_class in rcs(weak_monsters, k=num_monsters):
                 spawn_entity(monster_class)
 
         elif entity_mode == 'boss':
             # Boss arena - fewer but tougher enemies
             tough_monsters = ['monster_ogre', 'monster_hell_knight', 'monster_demon1', 'monster_enforcer']
-            num_monsters = random.randint(2, 4)
-            for _ in range(num_monsters):
-                monster_class = random.choice(tough_monsters)
+            num_monsters = ri(2, 4)
+            for monster_class in rcs(tough_monsters, k=num_monsters):
                 spawn_entity(monster_class)
 
         else:  # 'normal' mode (default)
             # Always spawn at least one monster
-            monster_class = random.choice(self.entity_pools['monsters'])
+            monster_class = rc(pools['monsters'])
             spawn_entity(monster_class)
 
             # Check if this room should have additional spawns
             if random.random() <= self.spawn_chance:
-                num_additional = random.randint(1, 3)
-                additional_categories = list(self.entity_pools.keys())
-
-                for _ in range(num_additional):
-                    category = random.choice(additional_categories)
-                    entity_class = random.choice(self.entity_pools[category])
+                num_additional = ri(1, 3)
+                additional_classes, additional_weights = self._additional_pool
+                for entity_class in rcs(additional_classes, cum_weights=additional_weights, k=num_additional):
                     spawn_entity(entity_class)
 
         return entities, entity_num
@@ -2308,16 +2549,16 @@ class QuakeDungeonGenerator:
                         if clamped_dx1 < clamped_dx2:
                             # Only write frame pieces if they have volume
                             if cell_x1 < clamped_dx1: # Left of door
-                                self._write_brush(f, cell_x1, min_y, wall_floor_z, clamped_dx1, max_y, wall_top_z, 'wall', current_room)
+                                self._write_wall_brush(f, cell_x1, min_y, wall_floor_z, clamped_dx1, max_y, wall_top_z, current_room)
                             if clamped_dx2 < cell_x2: # Right of door
-                                self._write_brush(f, clamped_dx2, min_y, wall_floor_z, cell_x2, max_y, wall_top_z, 'wall', current_room)
+                                self._write_wall_brush(f, clamped_dx2, min_y, wall_floor_z, cell_x2, max_y, wall_top_z, current_room)
 
                             # Above door (lintel)
-                            self._write_brush(f, clamped_dx1, min_y, door_z2, clamped_dx2, max_y, wall_top_z, 'wall', current_room)
+                            self._write_wall_brush(f, clamped_dx1, min_y, door_z2, clamped_dx2, max_y, wall_top_z, current_room)
                             continue
 
                     # No door or door doesn't overlap this cell
-                    self._write_brush(f, cell_x1, min_y, wall_floor_z, cell_x2, max_y, wall_top_z, 'wall', current_room)
+                    self._write_wall_brush(f, cell_x1, min_y, wall_floor_z, cell_x2, max_y, wall_top_z, current_room)
 
                 # --- Check West & East (Vertical Walls) ---
                 for dx, direction in [(x - 1, 'west'), (x + 1, 'east')]:
@@ -2353,18 +2594,26 @@ class QuakeDungeonGenerator:
                         if clamped_dy1 < clamped_dy2:
                             # Only write frame pieces if they have volume
                             if cell_y1 < clamped_dy1: # Below door
-                                self._write_brush(f, min_x, cell_y1, wall_floor_z, max_x, clamped_dy1, wall_top_z, 'wall', current_room)
+                                self._write_wall_brush(f, min_x, cell_y1, wall_floor_z, max_x, clamped_dy1, wall_top_z, current_room)
                             if clamped_dy2 < cell_y2: # Above door
-                                self._write_brush(f, min_x, clamped_dy2, wall_floor_z, max_x, cell_y2, wall_top_z, 'wall', current_room)
+                                self._write_wall_brush(f, min_x, clamped_dy2, wall_floor_z, max_x, cell_y2, wall_top_z, current_room)
 
                             # Lintel
-                            self._write_brush(f, min_x, clamped_dy1, door_z2, max_x, clamped_dy2, wall_top_z, 'wall', current_room)
+                            self._write_wall_brush(f, min_x, clamped_dy1, door_z2, max_x, clamped_dy2, wall_top_z, current_room)
                             continue
 
                     # No door or door doesn't overlap this cell
-                    self._write_brush(f, min_x, cell_y1, wall_floor_z, max_x, cell_y2, wall_top_z, 'wall', current_room)
+                    self._write_wall_brush(f, min_x, cell_y1, wall_floor_z, max_x, cell_y2, wall_top_z, current_room)
 
 
+    def _write_wall_brush(self, f, x1, y1, z1, x2, y2, z2, room):
+        """Write a wall segment brush with the room's wall texture on every face
+
+        Specialized form of _write_brush(..., 'wall', room) for the wall loop:
+        the texture is resolved once and written through _write_simple_brush.
+        """
+        self._write_simple_brush(f, x1, y1, z1, x2, y2, z2, self.get_texture('wall', room))
+
     def _build_theme_map(self):
         """Build a mapping of grid cells to themes
 
@@ -2386,33 +2635,13 @@ class QuakeDungeonGenerator:
         """
         Export the dungeon as a Quake .map file using a consistent,
         cell-by-cell generation method for all world geometry.
+
+        The map is assembled in memory and written with a single binary
+        write, skipping the per-call text encoding of a text-mode file.
         """
-        with open(filename, 'w') as f:
+        with io.StringIO() as f:
             # Write header
-            f.write('// Game: Quake\n')
-            f.write('// Format: Standard\n')
-            f.write('// entity 0\n')
-            f.write('{\n')
-            f.write('"message" "Deep Below The Ground..."\n')
-            f.write('"mapversion" "220"\n')
-            f.write('"sounds" "3"\n')
-            f.write('"_fog" "0.045 0.1 0.3 0.6"\n')
-            f.write('"_skyfog" ".2"\n')
-            f.write('"_telealpha" "1"\n')
-            f.write('"_wateralpha" "0.6"\n')
-            f.write('"_slimealpha" "0.8"\n')
-            f.write('"_lavaalpha" "1"\n')
-            f.write('"_sunlight" "200"\n')
-            f.write('"_sunlight2" "150"\n')
-            f.write('"_sunlight_color" "1 1 1"\n')
-            f.write('"_sun_mangle" "135 -65 0"\n')
-            f.write('"_sunlight_penumbra" "8"\n')
-            f.write('"_light" "32"\n')
-            f.write('"_bounce" "1"\n')
-            f.write('"_dirt" "1"\n')
-            f.write('"_dirtgain" "0.6"\n')
-            f.write('"_dirtdepth" "64"\n')
-            f.write('"classname" "worldspawn"\n')
+            f.write(_WORLDSPAWN_HEADER)
             if self.wad_path:
                 f.write(f'"wad" "{self.wad_path}"\n')
 
@@ -2618,6 +2847,8 @@ class QuakeDungeonGenerator:
 
             # --- ENTITY GENERATION ---
             entity_num = 1
+            if self.spawn_entities:
+                self._prepare_entity_pools()
             if self.rooms:
                 # Player Start
                 spawn_room = self.rooms[0] # Spawn in the first generated room for consistency
@@ -2630,16 +2861,19 @@ class QuakeDungeonGenerator:
                 z = self.floor_height + level_z_offset + 24
 
                 angle = random.choice([0, 90, 180, 270])
-                f.write('// entity 1\n{\n')
-                f.write('"classname" "info_player_start"\n')
-                f.write(f'"origin" "{room_center_x} {room_center_y} {z}"\n')
-                f.write(f'"angle" "{angle}"\n}}\n')
+                f.write('// entity 1\n{\n'
+                        '"classname" "info_player_start"\n'
+                        f'"origin" "{room_center_x} {room_center_y} {z}"\n'
+                        f'"angle" "{angle}"\n}}\n')
                 entity_num += 1
 
             # Lights and spawned items/monsters
             for room in self.rooms:
                 room_type_name = room.get('type', 'plain')
                 room_type = self.room_types.get(room_type_name, self.room_types['plain'])
+                # Brightness and optional color are shared by all lights in the room
+                light_value = room_type.get("lighting", 600)
+                color_line = f'"_color" "{room_type["light_color"]}"\n' if 'light_color' in room_type else ''
 
                 # Handle multi-light rooms
                 if room_type.get('multi_lights', False):
@@ -2666,18 +2900,9 @@ class QuakeDungeonGenerator:
                     room_level = room.get('level', 0)
                     level_z_offset = room_level * self.level_height
 
+                    z = level_z_offset + self.ceiling_height - 32
                     for light_x, light_y in light_positions:
-                        z = level_z_offset + self.ceiling_height - 32
-                        f.write(f'// entity {entity_num}\n{{\n')
-                        f.write('"classname" "light"\n')
-                        f.write(f'"origin" "{light_x} {light_y} {z}"\n')
-                        f.write(f'"light" "{room_type.get("lighting", 600)}"\n')
-
-                        # Add color if specified
-                        if 'light_color' in room_type:
-                            f.write(f'"_color" "{room_type["light_color"]}"\n')
-
-                        f.write('}\n')
+                        f.write(_LIGHT_TMPL.format(entity_num, light_x, light_y, z, light_value, color_line))
                         entity_num += 1
                 else:
                     # Single center light
@@ -2689,31 +2914,20 @@ class QuakeDungeonGenerator:
                     level_z_offset = room_level * self.level_height
                     z = level_z_offset + self.ceiling_height - 32
 
-                    f.write(f'// entity {entity_num}\n{{\n')
-                    f.write('"classname" "light"\n')
-                    f.write(f'"origin" "{x} {y} {z}"\n')
-                    f.write(f'"light" "{room_type.get("lighting", 600)}"\n')
-
-                    # Add color if specified
-                    if 'light_color' in room_type:
-                        f.write(f'"_color" "{room_type["light_color"]}"\n')
-
-                    f.write('}\n')
+                    f.write(_LIGHT_TMPL.format(entity_num, x, y, z, light_value, color_line))
                     entity_num += 1
 
                 if self.spawn_entities:
                     room_entities, entity_num = self._spawn_room_entities(room, entity_num)
-                    for entity in room_entities:
-                        f.write(f'// entity {entity["num"]}\n{{\n')
-                        f.write(f'"classname" "{entity["classname"]}"\n')
-                        f.write(f'"origin" "{entity["origin"]}"\n}}\n')
+                    f.write(''.join(_ENTITY_TMPL % (entity['num'], entity['classname'], entity['origin'])
+                                    for entity in room_entities))
             
             # Teleporter Entities
             for teleporter in self.teleporters:
                 if teleporter['type'] == 'trigger':
-                    f.write(f'// entity {entity_num}\n{{\n')
-                    f.write('"classname" "trigger_teleport"\n')
-                    f.write(f'"target" "{teleporter["target"]}"\n')
+                    f.write(f'// entity {entity_num}\n{{\n'
+                            '"classname" "trigger_teleport"\n'
+                            f'"target" "{teleporter["target"]}"\n')
                     x, y, z = teleporter['origin']
                     pad_size, pad_height = 64, 64
                     x1, x2 = x - pad_size / 2, x + pad_size / 2
@@ -2723,22 +2937,22 @@ class QuakeDungeonGenerator:
                     f.write('}\n')
                     entity_num += 1
                 elif teleporter['type'] == 'destination':
-                    f.write(f'// entity {entity_num}\n{{\n')
-                    f.write('"classname" "info_teleport_destination"\n')
-                    f.write(f'"targetname" "{teleporter["targetname"]}"\n')
                     x, y, z = teleporter['origin']
-                    f.write(f'"origin" "{x} {y} {z}"\n')
-                    f.write(f'"angle" "{teleporter["angle"]}"\n}}\n')
+                    f.write(f'// entity {entity_num}\n{{\n'
+                            '"classname" "info_teleport_destination"\n'
+                            f'"targetname" "{teleporter["targetname"]}"\n'
+                            f'"origin" "{x} {y} {z}"\n'
+                            f'"angle" "{teleporter["angle"]}"\n}}\n')
                     entity_num += 1
             
             # Door Entities
             for door in self.doors:
-                f.write(f'// entity {entity_num}\n{{\n')
-                f.write('"classname" "func_door"\n')
-                f.write(f'"angle" "{door["angle"]}"\n')
-                f.write('"sounds" "2"\n')
-                f.write('"wait" "3"\n')
-                f.write('"lip" "8"\n')
+                f.write(f'// entity {entity_num}\n{{\n'
+                        '"classname" "func_door"\n'
+                        f'"angle" "{door["angle"]}"\n'
+                        '"sounds" "2"\n'
+                        '"wait" "3"\n'
+                        '"lip" "8"\n')
                 door_x, door_y = door['position']
                 if door["direction"] in ['east', 'west']:
                     x1, x2 = door_x - self.door_thickness / 2, door_x + self.door_thickness / 2
@@ -2754,9 +2968,9 @@ class QuakeDungeonGenerator:
 
             # Liquid Pool trigger_hurt Entities
             for trigger in liquid_triggers:
-                f.write(f'// entity {entity_num}\n{{\n')
-                f.write('"classname" "trigger_hurt"\n')
-                f.write(f'"dmg" "{trigger["damage"]}"\n')
+                f.write(f'// entity {entity_num}\n{{\n'
+                        '"classname" "trigger_hurt"\n'
+                        f'"dmg" "{trigger["damage"]}"\n')
                 # Write the trigger brush
                 self._write_simple_brush(f, trigger['x1'], trigger['y1'], trigger['z1'],
                                         trigger['x2'], trigger['y2'], trigger['z2'], 'trigger')
@@ -2780,14 +2994,18 @@ class QuakeDungeonGenerator:
                 z1 = trigger_z
                 z2 = trigger_z + trigger_height
                 
-                f.write(f'// entity {entity_num}\n{{\n')
-                f.write('"classname" "trigger_changelevel"\n')
-                f.write('"map" "end"\n')
+                f.write(f'// entity {entity_num}\n{{\n'
+                        '"classname" "trigger_changelevel"\n'
+                        '"map" "end"\n')
                 # Write the trigger brush
                 self._write_simple_brush(f, x1, y1, z1, x2, y2, z2, 'trigger')
                 f.write('}\n')
                 entity_num += 1
 
+            data = f.getvalue().encode('utf-8')
+
+        _write_file_bytes(filename, data)
+
     def _build_room_map(self, level=None):
         """Build a 2D grid mapping cell coordinates to the index of the room occupying it.
 
@@ -2814,6 +3032,9 @@ class QuakeDungeonGenerator:
     def _write_brush(self, f, x1, y1, z1, x2, y2, z2, texture_type, room_or_corridor=None):
         """Write a brush (rectangular box) to the map file with appropriate textures
 
+        When texture_variety is False, the cached first-of-pool textures are
+        read directly instead of going through get_texture().
+
         Args:
             f: File handle to write to
             x1, y1, z1: Minimum coordinates of the brush
@@ -2821,14 +3042,21 @@ class QuakeDungeonGenerator:
             texture_type: Type of surface ('floor', 'ceiling', 'wall')
             room_or_corridor: Optional room or corridor dict with pre-assigned textures
         """
-        f.write('{\n')
-
         # Get textures for each surface
         # For floors and ceilings, use the specified type
         # For walls of floor/ceiling brushes, use wall textures
-        floor_texture = self.get_texture('floor', room_or_corridor)
-        ceiling_texture = self.get_texture('ceiling', room_or_corridor)
-        wall_texture = self.get_texture('wall', room_or_corridor)
+        if self.texture_variety:
+            floor_texture = self.get_texture('floor', room_or_corridor)
+            ceiling_texture = self.get_texture('ceiling', room_or_corridor)
+            wall_texture = self.get_texture('wall', room_or_corridor)
+        elif room_or_corridor:
+            floor_texture = room_or_corridor.get('floor_texture', self._tex_floor_const)
+            ceiling_texture = room_or_corridor.get('ceiling_texture', self._tex_ceiling_const)
+            wall_texture = room_or_corridor.get('wall_texture', self._tex_wall_const)
+        else:
+            floor_texture = self._tex_floor_const
+            ceiling_texture = self._tex_ceiling_const
+            wall_texture = self._tex_wall_const
 
         # Determine which texture to use for each face based on brush type
         if texture_type == 'floor':
@@ -2850,27 +3078,9 @@ class QuakeDungeonGenerator:
         # Using the exact pattern from Quake MAP specs
         # Each plane defined by 3 points, not necessarily on the brush vertices
         # Pattern: use small offsets (0,1) from the plane coordinate to define direction
+        f.write(_BRUSH_TMPL.format(x1, y1, z1, x2, y2, z2, x1 + 1, y1 + 1, z1 + 1,
+                                   side_tex, bottom_tex, top_tex))
 
-        # West face (x = x1)
-        f.write(f'( {x1} {y1} {z1} ) ( {x1} {y1+1} {z1} ) ( {x1} {y1} {z1+1} ) {side_tex} 0 0 0 1 1\n')
-
-        # East face (x = x2)
-        f.write(f'( {x2} {y1} {z1} ) ( {x2} {y1} {z1+1} ) ( {x2} {y1+1} {z1} ) {side_tex} 0 0 0 1 1\n')
-
-        # South face (y = y1)
-        f.write(f'( {x1} {y1} {z1} ) ( {x1} {y1} {z1+1} ) ( {x1+1} {y1} {z1} ) {side_tex} 0 0 0 1 1\n')
-
-        # North face (y = y2)
-        f.write(f'( {x1} {y2} {z1} ) ( {x1+1} {y2} {z1} ) ( {x1} {y2} {z1+1} ) {side_tex} 0 0 0 1 1\n')
-
-        # Bottom face (z = z1)
-        f.write(f'( {x1} {y1} {z1} ) ( {x1+1} {y1} {z1} ) ( {x1} {y1+1} {z1} ) {bottom_tex} 0 0 0 1 1\n')
-
-        # Top face (z = z2)
-        f.write(f'( {x1} {y1} {z2} ) ( {x1} {y1+1} {z2} ) ( {x1+1} {y1} {z2} ) {top_tex} 0 0 0 1 1\n')
-
-        f.write('}\n')
-    
     def print_layout(self):
         """Print ASCII representation of the dungeon"""
         print("\nDungeon Layout:")
@@ -2878,10 +3088,9 @@ class QuakeDungeonGenerator:
         # Print each level separately
         for level in range(self.num_levels):
             print(f"\n--- Level {level} ---")
-            for y in range(self.grid_size):
-                for x in range(self.grid_size):
-                    print('#' if self.grid[level][y][x] else '.', end='')
-                print()
+            # Build the whole level as one string rather than printing cell by cell
+            print('\n'.join(''.join('#' if cell else '.' for cell in row)
+                            for row in self.grid[level]))
 
         print(f"\nGenerated {len(self.rooms)} rooms and {len(self.doors)} doors connecting adjacent rooms")
 
@@ -2947,9 +3156,8 @@ if __name__ == '__main__':
     print(f"WAD path in map: {generator.wad_path if generator.wad_path else '(not specified)'}")
     print("\nTexture Settings:")
     print(f"  - Variety enabled: {generator.texture_variety}")
-    print(f"  - Floor textures: {len(generator.texture_pools['floor'])} options")
-    print(f"  - Wall textures: {len(generator.texture_pools['wall'])} options")
-    print(f"  - Ceiling textures: {len(generator.texture_pools['ceiling'])} options")
+    print('\n'.join(f"  - {surface.capitalize()} textures: {len(generator.texture_pools[surface])} options"
+                    for surface in ('floor', 'wall', 'ceiling')))
     print("\nEntity Spawning:")
     print(f"  - Spawning enabled: {generator.spawn_entities}")
     print(f"  - Spawn chance per room: {int(generator.spawn_chance * 100)}%")
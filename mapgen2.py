@@ -18,8 +18,135 @@ Design Philosophy:
 - Vertical spaces for dynamic gameplay
 """
 
+from dataclasses import dataclass, field
+import functools
+import itertools
+import logging
 import random
 import math
+import sys
+
+log = logging.getLogger(__name__)
+
+# Axis-aligned box brush: six faces, each three plane points plus texture
+_BRUSH_FMT = ('{\n'
+              + '( %d %d %d ) ( %d %d %d ) ( %d %d %d ) %s 0 0 0 1 1\n' * 6
+              + '}\n')
+
+# Map header followed by the opening of the worldspawn entity
+_HEADER_FMT = ('// Game: Quake\n'
+               '// Format: Standard\n'
+               '// Generated by: QuakeMapGenerator2\n'
+               '// Theme: %s\n'
+               '// Difficulty: %s\n'
+               '\n'
+               '// entity 0\n'
+               '{\n'
+               '"classname" "worldspawn"\n'
+               '"wad" "%s"\n'
+               '"message" "%s"\n'
+               '\n')
+
+
+@functools.lru_cache(maxsize=None)
+def _brush_template(texture):
+    """Brush format string with the texture name baked into all six faces"""
+    return _BRUSH_FMT.replace('%s', texture.replace('%', '%%'))
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_brush(x1, y1, z1, x2, y2, z2, texture):
+    """Format an axis-aligned box brush, reusing the text of repeated brushes"""
+    x1p = x1 + 1
+    y1p = y1 + 1
+    z1p = z1 + 1
+    return _brush_template(texture) % (
+        x1, y1, z1, x1, y1p, z1, x1, y1, z1p,    # West face (x = x1)
+        x2, y1, z1, x2, y1, z1p, x2, y1p, z1,    # East face (x = x2)
+        x1, y1, z1, x1, y1, z1p, x1p, y1, z1,    # South face (y = y1)
+        x1, y2, z1, x1p, y2, z1, x1, y2, z1p,    # North face (y = y2)
+        x1, y1, z1, x1p, y1, z1, x1, y1p, z1,    # Bottom face (z = z1)
+        x1, y1, z2, x1, y1p, z2, x1p, y1, z2,    # Top face (z = z2)
+    )
+
+
+# Bit for each wall side in a room's openings mask
+_SIDE_BITS = {'north': 1, 'south': 2, 'east': 4, 'west': 8}
+
+# Opening bit seen from the other end of a connection, keyed by its side
+_OPPOSITE_SIDE_BITS = {'north': 2, 'south': 1, 'east': 8, 'west': 4}
+
+
+def _plan_walls(x1, y1, x2, y2, floor_z, ceiling_z, openings_mask,
+                door_width, wall_thickness, door_height, texture):
+    """Plan the four wall brushes of a room as (x1, y1, z1, x2, y2, z2, texture)
+
+    Walls whose bit is set in openings_mask get a centered door opening:
+    they are split into two side sections plus a lintel above the door.
+    """
+    brushes = []
+    lintel_z = floor_z + door_height
+
+    for side_bit, horizontal, wx1, wy1, wx2, wy2 in (
+            (1, True, x1, y2 - wall_thickness, x2, y2),     # North wall (y = y2)
+            (2, True, x1, y1, x2, y1 + wall_thickness),     # South wall (y = y1)
+            (4, False, x2 - wall_thickness, y1, x2, y2),    # East wall (x = x2)
+            (8, False, x1, y1, x1 + wall_thickness, y2)):   # West wall (x = x1)
+        if not openings_mask & side_bit:
+            brushes.append((wx1, wy1, floor_z, wx2, wy2, ceiling_z, texture))
+        elif horizontal:
+            # Wall runs along X axis, opening centered on it
+            opening_start = wx1 + (wx2 - wx1 - door_width) // 2
+            opening_end = opening_start + door_width
+            if opening_start > wx1:
+                brushes.append((wx1, wy1, floor_z, opening_start, wy2, ceiling_z, texture))
+            if opening_end < wx2:
+                brushes.append((opening_end, wy1, floor_z, wx2, wy2, ceiling_z, texture))
+            if lintel_z < ceiling_z:
+                brushes.append((opening_start, wy1, lintel_z, opening_end, wy2, ceiling_z, texture))
+        else:
+            # Wall runs along Y axis, opening centered on it
+            opening_start = wy1 + (wy2 - wy1 - door_width) // 2
+            opening_end = opening_start + door_width
+            if opening_start > wy1:
+                brushes.append((wx1, wy1, floor_z, wx2, opening_start, ceiling_z, texture))
+            if opening_end < wy2:
+                brushes.append((wx1, opening_end, floor_z, wx2, wy2, ceiling_z, texture))
+            if lintel_z < ceiling_z:
+                brushes.append((wx1, opening_start, lintel_z, wx2, opening_end, ceiling_z, texture))
+
+    return brushes
+
+
+@dataclass(slots=True)
+class Room:
+    """A room of the layout, in map units around its center point"""
+    name: str
+    cx: int
+    cy: int
+    width: int
+    height: int
+    floor_z: int
+    ceiling_z: int
+    type: str
+    has_cover: bool = False
+    has_pillars: bool = False
+    cover_positions: tuple = ()
+    pillar_positions: tuple = ()
+    monsters: list = field(default_factory=list)
+
+    # Bounds derived from center and size, fixed once the room is created
+    x1: int = field(init=False)
+    y1: int = field(init=False)
+    x2: int = field(init=False)
+    y2: int = field(init=False)
+
+    def __post_init__(self):
+        self.x1 = self.cx - self.width // 2
+        self.y1 = self.cy - self.height // 2
+        self.x2 = self.x1 + self.width
+        self.y2 = self.y1 + self.height
+
 
 class QuakeMapGenerator2:
     def __init__(self, theme='medieval', difficulty='normal', wad_path='id.wad'):
@@ -81,6 +208,18 @@ class QuakeMapGenerator2:
             }
         }
 
+        # Intern texture names: every planned brush carries one in its cache key
+        self.themes = {name: {role: sys.intern(texture) for role, texture in textures.items()}
+                       for name, textures in self.themes.items()}
+
+        # Bind the active theme's textures once for the brush writers
+        theme_textures = self.themes[self.theme]
+        self._tex_floor = theme_textures['floor']
+        self._tex_wall = theme_textures['wall']
+        self._tex_ceiling = theme_textures['ceiling']
+        self._tex_trim = theme_textures['trim']
+        self._tex_door = theme_textures['door']
+
         # Monster pools by type (mix melee, ranged, flying as per best practices)
         self.monster_pools = {
             'melee': ['monster_knight', 'monster_dog', 'monster_demon1'],
@@ -98,14 +237,17 @@ class QuakeMapGenerator2:
 
         # Map structure (will be populated during generation)
         self.rooms = []
+
+        # Point entities as (classname, x, y, z, angle, extra) records,
+        # formatted into .map blocks when the file is written
         self.entities = []
 
     def generate_map(self, filename='mapgen2.map'):
         """Generate a complete Quake map following best practices"""
-        print(f"=== Quake Map Generator v2 ===")
-        print(f"Theme: {self.theme}")
-        print(f"Difficulty: {self.difficulty}")
-        print()
+        log.info("=== Quake Map Generator v2 ===")
+        log.info("Theme: %s", self.theme)
+        log.info("Difficulty: %s", self.difficulty)
+        log.info("")
 
         # Create intentional layout
         self._design_layout()
@@ -113,87 +255,91 @@ class QuakeMapGenerator2:
         # Write the map file
         self._write_map_file(filename)
 
-        print(f"\nMap generated: {filename}")
-        print(f"  Rooms: {len(self.rooms)}")
-        print(f"  Entities: {len(self.entities)}")
-        print(f"\nDesign notes:")
-        print(f"  - Follows arena combat design patterns")
-        print(f"  - Includes footholds of cover to avoid 'door problem'")
-        print(f"  - Strategic monster placement for dynamic encounters")
-        print(f"  - Consistent {self.theme} theme throughout")
+        log.info("\nMap generated: %s", filename)
+        log.info("  Rooms: %d", len(self.rooms))
+        log.info("  Entities: %d", len(self.entities))
+        log.info("\nDesign notes:")
+        log.info("  - Follows arena combat design patterns")
+        log.info("  - Includes footholds of cover to avoid 'door problem'")
+        log.info("  - Strategic monster placement for dynamic encounters")
+        log.info("  - Consistent %s theme throughout", self.theme)
 
     def _design_layout(self):
         """Design the map layout using intentional patterns"""
-        print("Designing map layout...")
+        log.info("Designing map layout...")
 
         # Start small and simple: 3-5 connected rooms with clear progression
         # Pattern: Spawn -> Small Combat -> Large Arena -> Exit
 
         # Room 1: Safe spawn room (768x768) - Large comfortable starting area
-        spawn_room = {
-            'name': 'Spawn Room',
-            'center': (768, 768),
-            'width': 768,
-            'height': 768,
-            'floor_z': -32,
-            'ceiling_z': 192,
-            'type': 'spawn',
-            'has_cover': False,
-            'monsters': []
-        }
+        spawn_room = Room(
+            name='Spawn Room',
+            cx=768,
+            cy=768,
+            width=768,
+            height=768,
+            floor_z=-32,
+            ceiling_z=192,
+            type='spawn',
+            has_cover=False,
+            monsters=[]
+        )
         self.rooms.append(spawn_room)
-        print(f"  Created: Spawn Room (safe, 768x768)")
+        log.info("  Created: Spawn Room (safe, 768x768)")
 
         # Room 2: First combat room with foothold of cover (896x768)
         # This demonstrates solving the "door problem" with cover near entrance
-        combat1_room = {
-            'name': 'First Combat',
-            'center': (2048, 768),
-            'width': 896,
-            'height': 768,
-            'floor_z': -32,
-            'ceiling_z': 192,
-            'type': 'combat',
-            'has_cover': True,  # Cover blocks near entrance
-            'cover_positions': [(1700, 600), (1700, 936)],  # Two cover blocks near west entrance
-            'monsters': self._select_monsters(3, ['melee', 'ranged'])
-        }
+        combat1_room = Room(
+            name='First Combat',
+            cx=2048,
+            cy=768,
+            width=896,
+            height=768,
+            floor_z=-32,
+            ceiling_z=192,
+            type='combat',
+            has_cover=True,  # Cover blocks near entrance
+            cover_positions=((1700, 600), (1700, 936)),  # Two cover blocks near west entrance
+            monsters=self._select_monsters(3, ['melee', 'ranged'])
+        )
         self.rooms.append(combat1_room)
-        print(f"  Created: First Combat Room (with cover, 896x768)")
+        log.info("  Created: First Combat Room (with cover, 896x768)")
 
         # Room 3: Large central arena with loop pattern (1280x1280)
         # Loop pattern allows kiting, good for multiple enemies
-        arena_room = {
-            'name': 'Central Arena',
-            'center': (2048, 2304),
-            'width': 1280,
-            'height': 1280,
-            'floor_z': -32,
-            'ceiling_z': 256,  # Taller ceiling for vertical gameplay
-            'type': 'arena',
-            'has_cover': True,
-            'has_pillars': True,  # Pillars create cover and break sightlines
-            'pillar_positions': [(1728, 1984), (2368, 1984), (1728, 2624), (2368, 2624)],
-            'monsters': self._select_monsters(6, ['melee', 'ranged', 'melee'])
-        }
+        arena_room = Room(
+            name='Central Arena',
+            cx=2048,
+            cy=2304,
+            width=1280,
+            height=1280,
+            floor_z=-32,
+            ceiling_z=256,  # Taller ceiling for vertical gameplay
+            type='arena',
+            has_cover=True,
+            has_pillars=True,  # Pillars create cover and break sightlines
+            pillar_positions=((1728, 1984), (2368, 1984), (1728, 2624), (2368, 2624)),
+            monsters=self._select_monsters(6, ['melee', 'ranged', 'melee'])
+        )
         self.rooms.append(arena_room)
-        print(f"  Created: Central Arena (large, with pillars, 1280x1280)")
+        log.info("  Created: Central Arena (large, with pillars, 1280x1280)")
 
         # Room 4: Side room (640x640)
         # Connected to arena
-        side_room = {
-            'name': 'Side Chamber',
-            'center': (3456, 2304),
-            'width': 640,
-            'height': 640,
-            'floor_z': -32,
-            'ceiling_z': 192,
-            'type': 'combat',
-            'has_cover': False,
-            'monsters': self._select_monsters(2, ['ranged'])
-        }
+        side_room = Room(
+            name='Side Chamber',
+            cx=3456,
+            cy=2304,
+            width=640,
+            height=640,
+            floor_z=-32,
+            ceiling_z=192,
+            type='combat',
+            has_cover=False,
+            monsters=self._select_monsters(2, ['ranged'])
+        )
         self.rooms.append(side_room)
-        print(f"  Created: Side Chamber (640x640)")
+        log.info("  Created: Side Chamber (640x640)")
 
         # Create connections between rooms
         self.connections = [
@@ -201,468 +347,341 @@ class QuakeMapGenerator2:
             {'from': 1, 'to': 2, 'type': 'opening', 'side': 'south'},  # Combat 1 to Arena (south wall of combat)
             {'from': 2, 'to': 3, 'type': 'opening', 'side': 'east'},  # Arena to Side (east wall of arena)
         ]
+        self._build_room_openings()
 
         # Add entities (player start, lights, items, monsters)
         self._add_entities()
 
-        print(f"Created {len(self.rooms)} rooms with intentional combat flow")
+        log.info("Created %d rooms with intentional combat flow", len(self.rooms))
 
     def _select_monsters(self, count, types):
         """Select monsters based on type preferences and difficulty"""
         mult = self.difficulty_settings[self.difficulty]['monster_count']
         count = int(count * mult)
 
-        monsters = []
-        for _ in range(count):
-            monster_type = random.choice(types)
+        # Flatten the type pools into one weighted pool so all monsters come
+        # from a single random.choices() call. Each entry in types carries the
+        # same total weight, matching a type pick followed by a pool pick.
+        monster_classes = []
+        weights = []
+        for monster_type in types:
             monster_pool = self.monster_pools.get(monster_type, self.monster_pools['melee'])
-            monsters.append(random.choice(monster_pool))
+            for monster_class in monster_pool:
+                monster_classes.append(monster_class)
+                weights.append(1 / len(monster_pool))
 
-        return monsters
+        return random.choices(monster_classes, weights=weights, k=count)
 
     def _add_entities(self):
         """Add all entities: player start, lights, items, monsters"""
-        print("Adding entities...")
+        log.info("Adding entities...")
+        entities = self.entities = []
+        push = entities.append
+        light_count = 0
 
         # Player start (always in spawn room)
         spawn_room = self.rooms[0]
-        self.entities.append({
-            'classname': 'info_player_start',
-            'origin': f"{spawn_room['center'][0]} {spawn_room['center'][1]} 24",
-            'angle': '0'
-        })
-        print("  Added: Player start")
+        push(('info_player_start', spawn_room.cx, spawn_room.cy, 24, 0, None))
+        log.info("  Added: Player start")
 
         # Add lights to each room (multiple lights for large rooms)
         for i, room in enumerate(self.rooms):
             # Calculate number of lights based on room size
-            room_area = room['width'] * room['height']
+            room_area = room.width * room.height
             num_lights = max(1, room_area // (512 * 512))  # 1 light per 512x512 area
 
+            center_x, center_y = room.cx, room.cy
+            light_z = room.ceiling_z - 32  # 32 units below ceiling
+
             # Place lights evenly
-            for light_idx in range(num_lights):
-                if num_lights == 1:
-                    # Single light in center
-                    light_x = room['center'][0]
-                    light_y = room['center'][1]
-                else:
-                    # Multiple lights in grid
-                    grid_size = int(math.sqrt(num_lights))
-                    row = light_idx // grid_size
-                    col = light_idx % grid_size
-                    offset_x = (col - grid_size/2 + 0.5) * (room['width'] / grid_size)
-                    offset_y = (row - grid_size/2 + 0.5) * (room['height'] / grid_size)
-                    light_x = room['center'][0] + offset_x
-                    light_y = room['center'][1] + offset_y
-
-                light_z = room['ceiling_z'] - 32  # 32 units below ceiling
-
-                self.entities.append({
-                    'classname': 'light',
-                    'origin': f"{int(light_x)} {int(light_y)} {light_z}",
-                    'light': str(self.default_light)
-                })
-
-        print(f"  Added: {len([e for e in self.entities if e['classname'] == 'light'])} lights")
+            if num_lights == 1:
+                # Single light in center
+                light_positions = [(center_x, center_y)]
+            else:
+                # Multiple lights in grid: compute each column and row offset
+                # once, then combine them row by row
+                grid_size = math.isqrt(num_lights)
+                num_rows = -(-num_lights // grid_size)
+                cell_width = room.width / grid_size
+                cell_height = room.height / grid_size
+                col_offsets = [(col - grid_size/2 + 0.5) * cell_width
+                               for col in range(grid_size)]
+                row_offsets = [(row - grid_size/2 + 0.5) * cell_height
+                               for row in range(num_rows)]
+                light_positions = [(center_x + offset_x, center_y + offset_y)
+                                   for offset_y in row_offsets
+                                   for offset_x in col_offsets][:num_lights]
+
+            for light_x, light_y in light_positions:
+                push(('light', int(light_x), int(light_y), light_z,
+                      None, {'light': self.default_light}))
+            light_count += len(light_positions)
+
+        log.info("  Added: %d lights", light_count)
 
         # Add health and ammo (balanced for difficulty)
         # Place in spawn room for easy access
-        spawn_center = self.rooms[0]['center']
-        self.entities.append({
-            'classname': 'item_health',
-            'origin': f"{spawn_center[0] - 64} {spawn_center[1]} 24"
-        })
-        self.entities.append({
-            'classname': 'item_shells',
-            'origin': f"{spawn_center[0] + 64} {spawn_center[1]} 24"
-        })
-        self.entities.append({
-            'classname': 'weapon_supershotgun',
-            'origin': f"{spawn_center[0]} {spawn_center[1] + 64} 24"
-        })
-        print("  Added: Supplies (health, ammo, weapon)")
+        spawn_x, spawn_y = spawn_room.cx, spawn_room.cy
+        push(('item_health', spawn_x - 64, spawn_y, 24, None, None))
+        push(('item_shells', spawn_x + 64, spawn_y, 24, None, None))
+        push(('weapon_supershotgun', spawn_x, spawn_y + 64, 24, None, None))
+        log.info("  Added: Supplies (health, ammo, weapon)")
 
         # Add monsters to rooms based on design
-        monster_count = 0
-        for room in self.rooms:
-            for monster_class in room.get('monsters', []):
-                # Place monsters in room, avoiding center
-                offset_x = random.randint(-room['width']//3, room['width']//3)
-                offset_y = random.randint(-room['height']//3, room['height']//3)
-                monster_x = room['center'][0] + offset_x
-                monster_y = room['center'][1] + offset_y
-                monster_z = room['floor_z'] + 32 + 24  # Floor + thickness + offset
-
-                # Face towards center of room
-                angle = random.choice([0, 90, 180, 270])
-
-                self.entities.append({
-                    'classname': monster_class,
-                    'origin': f"{int(monster_x)} {int(monster_y)} {monster_z}",
-                    'angle': str(angle)
-                })
-                monster_count += 1
-
-        print(f"  Added: {monster_count} monsters")
-
-    def _write_map_file(self, filename):
-        """Write the complete .map file"""
-        print(f"\nWriting map file: {filename}")
-
-        with open(filename, 'w') as f:
-            # Header
-            f.write('// Game: Quake\n')
-            f.write('// Format: Standard\n')
-            f.write(f'// Generated by: QuakeMapGenerator2\n')
-            f.write(f'// Theme: {self.theme}\n')
-            f.write(f'// Difficulty: {self.difficulty}\n')
-            f.write('\n')
-
-            # Entity 0: worldspawn (contains all geometry)
-            f.write('// entity 0\n')
-            f.write('{\n')
-            f.write('"classname" "worldspawn"\n')
-            f.write(f'"wad" "{self.wad_path}"\n')
-            f.write(f'"message" "{self.map_title}"\n')
-            f.write('\n')
-
-            # Write all room geometry
-            for i, room in enumerate(self.rooms):
-                f.write(f'// ========== {room["name"].upper()} ==========\n')
-                self._write_room(f, room, i)
-                f.write('\n')
-
-            # Write corridor geometry to bridge gaps between rooms
-            for i, conn in enumerate(self.connections):
-                f.write(f'// ========== CORRIDOR {i+1} ==========\n')
-                self._write_corridor(f, conn)
-                f.write('\n')
-
-            f.write('}\n')  # Close worldspawn
-
-            # Write all entities
-            for i, entity in enumerate(self.entities):
-                f.write(f'// entity {i+1}\n')
-                f.write('{\n')
-                for key, value in entity.items():
-                    f.write(f'"{key}" "{value}"\n')
-                f.write('}\n')
-
-        print(f"Map file written successfully")
-
-    def _write_room(self, f, room, room_index):
-        """Write geometry for a single room"""
-        # Calculate room bounds from center and dimensions
-        x1 = room['center'][0] - room['width'] // 2
-        y1 = room['center'][1] - room['height'] // 2
-        x2 = x1 + room['width']
-        y2 = y1 + room['height']
-
-        floor_z = room['floor_z']
-        ceiling_z = room['ceiling_z']
-
-        theme = self.themes[self.theme]
-
-        # Find openings for this room
-        openings = self._get_room_openings(room_index)
-
-        # Floor
-        self._write_brush(f, x1, y1, floor_z - self.floor_thickness,
-                         x2, y2, floor_z, theme['floor'])
-
-        # Ceiling
-        self._write_brush(f, x1, y1, ceiling_z,
-                         x2, y2, ceiling_z + self.floor_thickness, theme['ceiling'])
-
-        # Walls with openings
-        self._write_walls_with_openings(f, x1, y1, x2, y2, floor_z, ceiling_z, openings, theme)
-
-        # Add special features based on room type
-        if room.get('has_cover'):
-            self._write_cover_blocks(f, room, theme)
-
-        if room.get('has_pillars'):
-            self._write_pillars(f, room, theme)
-
-    def _get_room_openings(self, room_index):
-        """Get all openings for a specific room"""
-        openings = []
-        for conn in self.connections:
-            if conn['from'] == room_index:
-                openings.append({
-                    'side': conn['side'],
-                    'width': self.door_width
-                })
-            elif conn['to'] == room_index:
-                # Get opposite side
-                opposite_sides = {'north': 'south', 'south': 'north', 'east': 'west', 'west': 'east'}
-                openings.append({
-                    'side': opposite_sides[conn['side']],
-                    'width': self.door_width
-                })
-        return openings
-
-    def _write_walls_with_openings(self, f, x1, y1, x2, y2, floor_z, ceiling_z, openings, theme):
-        """Write walls with openings for doors"""
-        # Group openings by side
-        openings_by_side = {'north': [], 'south': [], 'east': [], 'west': []}
-        for opening in openings:
-            openings_by_side[opening['side']].append(opening)
-
-        # North wall (y = y2)
-        if not openings_by_side['north']:
-            self._write_brush(f, x1, y2 - self.wall_thickness, floor_z,
-                             x2, y2, ceiling_z, theme['wall'])
-        else:
-            self._write_wall_with_opening(f, x1, y2 - self.wall_thickness, x2, y2,
-                                         floor_z, ceiling_z, 'horizontal', theme['wall'])
-
-        # South wall (y = y1)
-        if not openings_by_side['south']:
-            self._write_brush(f, x1, y1, floor_z,
-                             x2, y1 + self.wall_thickness, ceiling_z, theme['wall'])
-        else:
-            self._write_wall_with_opening(f, x1, y1, x2, y1 + self.wall_thickness,
-                                         floor_z, ceiling_z, 'horizontal', theme['wall'])
-
-        # East wall (x = x2)
-        if not openings_by_side['east']:
-            self._write_brush(f, x2 - self.wall_thickness, y1, floor_z,
-                             x2, y2, ceiling_z, theme['wall'])
-        else:
-            self._write_wall_with_opening(f, x2 - self.wall_thickness, y1, x2, y2,
-                                         floor_z, ceiling_z, 'vertical', theme['wall'])
-
-        # West wall (x = x1)
-        if not openings_by_side['west']:
-            self._write_brush(f, x1, y1, floor_z,
-                             x1 + self.wall_thickness, y2, ceiling_z, theme['wall'])
-        else:
-            self._write_wall_with_opening(f, x1, y1, x1 + self.wall_thickness, y2,
-                                         floor_z, ceiling_z, 'vertical', theme['wall'])
-
-    def _write_wall_with_opening(self, f, x1, y1, x2, y2, floor_z, ceiling_z, orientation, texture):
-        """Write a wall with a centered opening for a door"""
-        # Calculate opening position (centered on wall)
-        if orientation == 'horizontal':
-            # Wall runs along X axis (north/south wall)
-            wall_length = x2 - x1
-            opening_start = x1 + (wall_length - self.door_width) // 2
-            opening_end = opening_start + self.door_width
-
-            # Left section
-            if opening_start > x1:
-                self._write_brush(f, x1, y1, floor_z, opening_start, y2, ceiling_z, texture)
-
-            # Right section
-            if opening_end < x2:
-                self._write_brush(f, opening_end, y1, floor_z, x2, y2, ceiling_z, texture)
-
-            # Lintel (above door)
-            lintel_z = floor_z + self.door_height
-            if lintel_z < ceiling_z:
-                self._write_brush(f, opening_start, y1, lintel_z, opening_end, y2, ceiling_z, texture)
-
-        else:  # vertical
-            # Wall runs along Y axis (east/west wall)
-            wall_length = y2 - y1
-            opening_start = y1 + (wall_length - self.door_width) // 2
-            opening_end = opening_start + self.door_width
-
-            # Bottom section
-            if opening_start > y1:
-                self._write_brush(f, x1, y1, floor_z, x2, opening_start, ceiling_z, texture)
+        placements = self._gen_monster_placements()
+        for monster_class, monster_x, monster_y, monster_z, angle in placements:
+            push((monster_class, monster_x, monster_y, monster_z, angle, None))
 
-            # Top section
-            if opening_end < y2:
-                self._write_brush(f, x1, opening_end, floor_z, x2, y2, ceiling_z, texture)
+        log.info("  Added: %d monsters", len(placements))
 
-            # Lintel (above door)
-            lintel_z = floor_z + self.door_height
-            if lintel_z < ceiling_z:
-                self._write_brush(f, x1, opening_start, lintel_z, x2, opening_end, ceiling_z, texture)
-
-    def _write_cover_blocks(self, f, room, theme):
-        """Write cover blocks for combat arenas"""
-        for pos in room.get('cover_positions', []):
-            # Each cover block is 64x64x64
-            cover_size = 64
-            x1 = pos[0] - cover_size // 2
-            y1 = pos[1] - cover_size // 2
-            x2 = x1 + cover_size
-            y2 = y1 + cover_size
-            z1 = room['floor_z']
-            z2 = z1 + cover_size
-
-            self._write_brush(f, x1, y1, z1, x2, y2, z2, theme['trim'])
-
-    def _write_pillars(self, f, room, theme):
-        """Write pillars for arena rooms"""
-        for pos in room.get('pillar_positions', []):
-            # Each pillar is 48x48, floor to ceiling
-            pillar_size = 48
-            x1 = pos[0] - pillar_size // 2
-            y1 = pos[1] - pillar_size // 2
-            x2 = x1 + pillar_size
-            y2 = y1 + pillar_size
-            z1 = room['floor_z']
-            z2 = room['ceiling_z']
-
-            self._write_brush(f, x1, y1, z1, x2, y2, z2, theme['trim'])
-
-
-    def _write_corridor(self, f, conn):
-        """Write corridor geometry to bridge the gap between two rooms"""
-        room1 = self.rooms[conn['from']]
-        room2 = self.rooms[conn['to']]
+    def _entity_block(self, number, classname, x, y, z, angle=None, extra=None):
+        """Format the .map block of one point entity
 
-        theme = self.themes[self.theme]
+        Args:
+            number: Entity number, counted after worldspawn (entity 0)
+            classname: Entity classname
+            x, y, z: Integer origin
+            angle: Optional facing angle
+            extra: Optional dict of additional key/value pairs
+        """
+        block = ('// entity %d\n{\n"classname" "%s"\n"origin" "%d %d %d"\n'
+                 % (number, classname, x, y, z))
+        if angle is not None:
+            block += '"angle" "%d"\n' % angle
+        if extra:
+            block += ''.join(['"%s" "%s"\n' % item for item in extra.items()])
+        return block + '}\n'
+
+    def _gen_monster_placements(self):
+        """Draw positions and facings for every room's monsters
+
+        All offsets and angles for a room come from batched random.choices()
+        calls instead of one randint/choice round-trip per monster.
+
+        Returns:
+            List of (classname, x, y, z, angle) tuples in room order
+        """
+        choices = random.choices
+        placements = []
+        for room in self.rooms:
+            monsters = room.monsters
+            if not monsters:
+                continue
 
-        # Calculate room boundaries
-        r1_x1 = room1['center'][0] - room1['width'] // 2
-        r1_y1 = room1['center'][1] - room1['height'] // 2
-        r1_x2 = r1_x1 + room1['width']
-        r1_y2 = r1_y1 + room1['height']
+            count = len(monsters)
+            center_x, center_y = room.cx, room.cy
+            monster_z = room.floor_z + 32 + 24  # Floor + thickness + offset
 
-        r2_x1 = room2['center'][0] - room2['width'] // 2
-        r2_y1 = room2['center'][1] - room2['height'] // 2
-        r2_x2 = r2_x1 + room2['width']
-        r2_y2 = r2_y1 + room2['height']
+            # Place monsters in room, avoiding center
+            offsets_x = choices(range(-room.width//3, room.width//3 + 1), k=count)
+            offsets_y = choices(range(-room.height//3, room.height//3 + 1), k=count)
 
-        # Use the lower floor z for corridor
-        floor_z = min(room1['floor_z'], room2['floor_z'])
-        ceiling_z = floor_z + self.door_height
+            # Face towards center of room
+            angles = choices((0, 90, 180, 270), k=count)
 
-        # Corridor width (matches door width plus some margin)
-        corridor_width = self.door_width * 2  # 128 units
+            for monster_class, offset_x, offset_y, angle in zip(monsters, offsets_x, offsets_y, angles):
+                placements.append((monster_class, center_x + offset_x, center_y + offset_y,
+                                   monster_z, angle))
 
-        side = conn['side']
+        return placements
 
-        if side == 'east':
-            # Room 1 is west of Room 2, connect along X axis
-            # Corridor spans from room1's east wall to room2's west wall
-            corridor_x1 = r1_x2 - self.wall_thickness
-            corridor_x2 = r2_x1 + self.wall_thickness
+    def _write_map_file(self, filename):
+        """Write the complete .map file"""
+        log.info("\nWriting map file: %s", filename)
 
-            # Center corridor on room centers Y coordinate
-            center_y = (room1['center'][1] + room2['center'][1]) // 2
-            corridor_y1 = center_y - corridor_width // 2
-            corridor_y2 = center_y + corridor_width // 2
+        # Brush text is cached per map; start each write with an empty cache
+        _format_brush.cache_clear()
 
-            # Floor
-            self._write_brush(f, corridor_x1, corridor_y1, floor_z - self.floor_thickness,
-                             corridor_x2, corridor_y2, floor_z, theme['floor'])
+        # Collect every fragment in a list and hand the file a single write
+        out = []
 
-            # Ceiling
-            self._write_brush(f, corridor_x1, corridor_y1, ceiling_z,
-                             corridor_x2, corridor_y2, ceiling_z + self.floor_thickness, theme['ceiling'])
+        # Header and worldspawn opener (entity 0 contains all geometry)
+        out.append(_HEADER_FMT % (self.theme, self.difficulty,
+                                  self.wad_path, self.map_title))
 
-            # North wall
-            self._write_brush(f, corridor_x1, corridor_y2 - self.wall_thickness, floor_z,
-                             corridor_x2, corridor_y2, ceiling_z, theme['wall'])
+        # Write all room geometry
+        for i, room in enumerate(self.rooms):
+            out.append(f'// ========== {room.name.upper()} ==========\n')
+            self._write_room(out, room, i)
+            out.append('\n')
 
-            # South wall
-            self._write_brush(f, corridor_x1, corridor_y1, floor_z,
-                             corridor_x2, corridor_y1 + self.wall_thickness, ceiling_z, theme['wall'])
+        # Write corridor geometry to bridge gaps between rooms
+        for i, conn in enumerate(self.connections):
+            out.append(f'// ========== CORRIDOR {i+1} ==========\n')
+            self._write_corridor(out, conn)
+            out.append('\n')
 
-        elif side == 'west':
-            # Room 1 is east of Room 2, connect along X axis
-            corridor_x1 = r2_x2 - self.wall_thickness
-            corridor_x2 = r1_x1 + self.wall_thickness
+        out.append('}\n')  # Close worldspawn
 
-            center_y = (room1['center'][1] + room2['center'][1]) // 2
-            corridor_y1 = center_y - corridor_width // 2
-            corridor_y2 = center_y + corridor_width // 2
+        # Write all point entities, numbered after worldspawn
+        entity_block = self._entity_block
+        out.extend([entity_block(number, *entity)
+                    for number, entity in enumerate(self.entities, 1)])
 
-            # Floor
-            self._write_brush(f, corridor_x1, corridor_y1, floor_z - self.floor_thickness,
-                             corridor_x2, corridor_y2, floor_z, theme['floor'])
+        # Encode the map text in one pass and write the bytes; the wad path
+        # and texture names may hold non-ASCII characters
+        with open(filename, 'wb') as f:
+            f.write(''.join(out).encode('utf-8'))
 
-            # Ceiling
-            self._write_brush(f, corridor_x1, corridor_y1, ceiling_z,
-                             corridor_x2, corridor_y2, ceiling_z + self.floor_thickness, theme['ceiling'])
+        log.info("Map file written successfully")
 
-            # North wall
-            self._write_brush(f, corridor_x1, corridor_y2 - self.wall_thickness, floor_z,
-                             corridor_x2, corridor_y2, ceiling_z, theme['wall'])
+    def _write_room(self, out, room, room_index):
+        """Append geometry for a single room to the out list"""
+        # Room bounds (computed from center and dimensions on creation)
+        x1, y1, x2, y2 = room.x1, room.y1, room.x2, room.y2
 
-            # South wall
-            self._write_brush(f, corridor_x1, corridor_y1, floor_z,
-                             corridor_x2, corridor_y1 + self.wall_thickness, ceiling_z, theme['wall'])
+        floor_z = room.floor_z
+        ceiling_z = room.ceiling_z
+        floor_thickness = self.floor_thickness
 
-        elif side == 'south':
-            # Room 1 is north of Room 2, connect along Y axis
-            corridor_y1 = r1_y2 - self.wall_thickness
-            corridor_y2 = r2_y1 + self.wall_thickness
+        tex_floor, tex_wall, tex_ceiling = self._tex_floor, self._tex_wall, self._tex_ceiling
 
-            center_x = (room1['center'][0] + room2['center'][0]) // 2
-            corridor_x1 = center_x - corridor_width // 2
-            corridor_x2 = center_x + corridor_width // 2
+        # Find openings for this room
+        openings_mask = self._get_room_openings(room_index)
 
+        # Plan all brush boxes for the room first, then format them in one pass
+        brushes = [
             # Floor
-            self._write_brush(f, corridor_x1, corridor_y1, floor_z - self.floor_thickness,
-                             corridor_x2, corridor_y2, floor_z, theme['floor'])
-
+            (x1, y1, floor_z - floor_thickness, x2, y2, floor_z, tex_floor),
             # Ceiling
-            self._write_brush(f, corridor_x1, corridor_y1, ceiling_z,
-                             corridor_x2, corridor_y2, ceiling_z + self.floor_thickness, theme['ceiling'])
+            (x1, y1, ceiling_z, x2, y2, ceiling_z + floor_thickness, tex_ceiling),
+        ]
 
-            # East wall
-            self._write_brush(f, corridor_x2 - self.wall_thickness, corridor_y1, floor_z,
-                             corridor_x2, corridor_y2, ceiling_z, theme['wall'])
+        # Walls with openings
+        self._write_walls_with_openings(brushes, x1, y1, x2, y2, floor_z, ceiling_z, openings_mask, tex_wall)
 
-            # West wall
-            self._write_brush(f, corridor_x1, corridor_y1, floor_z,
-                             corridor_x1 + self.wall_thickness, corridor_y2, ceiling_z, theme['wall'])
+        # Add special features based on room type
+        if room.has_cover:
+            self._write_cover_blocks(brushes, room, self._tex_trim)
 
-        elif side == 'north':
-            # Room 1 is south of Room 2, connect along Y axis
-            corridor_y1 = r2_y2 - self.wall_thickness
-            corridor_y2 = r1_y1 + self.wall_thickness
+        if room.has_pillars:
+            self._write_pillars(brushes, room, self._tex_trim)
 
-            center_x = (room1['center'][0] + room2['center'][0]) // 2
-            corridor_x1 = center_x - corridor_width // 2
-            corridor_x2 = center_x + corridor_width // 2
+        self._write_brushes(out, brushes)
 
-            # Floor
-            self._write_brush(f, corridor_x1, corridor_y1, floor_z - self.floor_thickness,
-                             corridor_x2, corridor_y2, floor_z, theme['floor'])
+    def _build_room_openings(self):
+        """Record every room's door openings as a side bitmask in one pass over connections"""
+        self._room_openings = [0] * len(self.rooms)
+        for conn in self.connections:
+            self._room_openings[conn['from']] |= _SIDE_BITS[conn['side']]
+            self._room_openings[conn['to']] |= _OPPOSITE_SIDE_BITS[conn['side']]
 
-            # Ceiling
-            self._write_brush(f, corridor_x1, corridor_y1, ceiling_z,
-                             corridor_x2, corridor_y2, ceiling_z + self.floor_thickness, theme['ceiling'])
+    def _get_room_openings(self, room_index):
+        """Get the openings mask (see _SIDE_BITS) for a specific room"""
+        return self._room_openings[room_index]
+
+    def _write_walls_with_openings(self, brushes, x1, y1, x2, y2, floor_z, ceiling_z, openings_mask, tex_wall):
+        """Add wall brushes with openings for doors to the brushes list"""
+        brushes.extend(_plan_walls(x1, y1, x2, y2, floor_z, ceiling_z, openings_mask,
+                                   self.door_width, self.wall_thickness, self.door_height,
+                                   tex_wall))
+
+    def _write_cover_blocks(self, brushes, room, tex_trim):
+        """Add cover block brushes for combat arenas"""
+        # Each cover block is 64x64x64
+        cover_size = 64
+        half_size = cover_size // 2
+        z1 = room.floor_z
+        z2 = z1 + cover_size
+        for pos_x, pos_y in room.cover_positions:
+            x1 = pos_x - half_size
+            y1 = pos_y - half_size
+            brushes.append((x1, y1, z1, x1 + cover_size, y1 + cover_size, z2, tex_trim))
+
+    def _write_pillars(self, brushes, room, tex_trim):
+        """Add pillar brushes for arena rooms"""
+        # Each pillar is 48x48, floor to ceiling
+        pillar_size = 48
+        half_size = pillar_size // 2
+        z1 = room.floor_z
+        z2 = room.ceiling_z
+        for pos_x, pos_y in room.pillar_positions:
+            x1 = pos_x - half_size
+            y1 = pos_y - half_size
+            brushes.append((x1, y1, z1, x1 + pillar_size, y1 + pillar_size, z2, tex_trim))
+
+
+    def _write_corridor(self, out, conn):
+        """Write corridor geometry to bridge the gap between two rooms"""
+        room1 = self.rooms[conn['from']]
+        room2 = self.rooms[conn['to']]
 
-            # East wall
-            self._write_brush(f, corridor_x2 - self.wall_thickness, corridor_y1, floor_z,
-                             corridor_x2, corridor_y2, ceiling_z, theme['wall'])
+        tex_floor, tex_wall, tex_ceiling = self._tex_floor, self._tex_wall, self._tex_ceiling
 
-            # West wall
-            self._write_brush(f, corridor_x1, corridor_y1, floor_z,
-                             corridor_x1 + self.wall_thickness, corridor_y2, ceiling_z, theme['wall'])
+        # Room boundaries
+        r1_x1, r1_y1, r1_x2, r1_y2 = room1.x1, room1.y1, room1.x2, room1.y2
+        r2_x1, r2_y1, r2_x2, r2_y2 = room2.x1, room2.y1, room2.x2, room2.y2
 
-    def _write_brush(self, f, x1, y1, z1, x2, y2, z2, texture):
-        """Write a simple axis-aligned box brush"""
-        f.write('{\n')
+        # Use the lower floor z for corridor
+        wall_thickness = self.wall_thickness
+        floor_thickness = self.floor_thickness
+        floor_z = min(room1.floor_z, room2.floor_z)
+        ceiling_z = floor_z + self.door_height
 
-        # West face (x = x1)
-        f.write(f'( {x1} {y1} {z1} ) ( {x1} {y1+1} {z1} ) ( {x1} {y1} {z1+1} ) {texture} 0 0 0 1 1\n')
+        # Corridor width (matches door width plus some margin)
+        corridor_width = self.door_width * 2  # 128 units
+        half_width = corridor_width // 2
 
-        # East face (x = x2)
-        f.write(f'( {x2} {y1} {z1} ) ( {x2} {y1} {z1+1} ) ( {x2} {y1+1} {z1} ) {texture} 0 0 0 1 1\n')
+        side = conn['side']
 
-        # South face (y = y1)
-        f.write(f'( {x1} {y1} {z1} ) ( {x1} {y1} {z1+1} ) ( {x1+1} {y1} {z1} ) {texture} 0 0 0 1 1\n')
+        if side == 'east' or side == 'west':
+            if side == 'east':
+                # Room 1 is west of Room 2, connect along X axis
+                # Corridor spans from room1's east wall to room2's west wall
+                corridor_x1 = r1_x2 - wall_thickness
+                corridor_x2 = r2_x1 + wall_thickness
+            else:
+                # Room 1 is east of Room 2, connect along X axis
+                corridor_x1 = r2_x2 - wall_thickness
+                corridor_x2 = r1_x1 + wall_thickness
 
-        # North face (y = y2)
-        f.write(f'( {x1} {y2} {z1} ) ( {x1+1} {y2} {z1} ) ( {x1} {y2} {z1+1} ) {texture} 0 0 0 1 1\n')
+            # Center corridor on room centers Y coordinate
+            center_y = (room1.cy + room2.cy) // 2
+            corridor_y1 = center_y - half_width
+            corridor_y2 = center_y + half_width
+
+            # North and south walls
+            wall_a = (corridor_x1, corridor_y2 - wall_thickness, floor_z,
+                      corridor_x2, corridor_y2, ceiling_z, tex_wall)
+            wall_b = (corridor_x1, corridor_y1, floor_z,
+                      corridor_x2, corridor_y1 + wall_thickness, ceiling_z, tex_wall)
+
+        elif side == 'south' or side == 'north':
+            if side == 'south':
+                # Room 1 is north of Room 2, connect along Y axis
+                corridor_y1 = r1_y2 - wall_thickness
+                corridor_y2 = r2_y1 + wall_thickness
+            else:
+                # Room 1 is south of Room 2, connect along Y axis
+                corridor_y1 = r2_y2 - wall_thickness
+                corridor_y2 = r1_y1 + wall_thickness
+
+            center_x = (room1.cx + room2.cx) // 2
+            corridor_x1 = center_x - half_width
+            corridor_x2 = center_x + half_width
+
+            # East and west walls
+            wall_a = (corridor_x2 - wall_thickness, corridor_y1, floor_z,
+                      corridor_x2, corridor_y2, ceiling_z, tex_wall)
+            wall_b = (corridor_x1, corridor_y1, floor_z,
+                      corridor_x1 + wall_thickness, corridor_y2, ceiling_z, tex_wall)
 
-        # Bottom face (z = z1)
-        f.write(f'( {x1} {y1} {z1} ) ( {x1+1} {y1} {z1} ) ( {x1} {y1+1} {z1} ) {texture} 0 0 0 1 1\n')
+        else:
+            return
 
-        # Top face (z = z2)
-        f.write(f'( {x1} {y1} {z2} ) ( {x1} {y1+1} {z2} ) ( {x1+1} {y1} {z2} ) {texture} 0 0 0 1 1\n')
+        # Floor, ceiling and both side walls in one batch
+        self._write_brushes(out, (
+            (corridor_x1, corridor_y1, floor_z - floor_thickness,
+             corridor_x2, corridor_y2, floor_z, tex_floor),
+            (corridor_x1, corridor_y1, ceiling_z,
+             corridor_x2, corridor_y2, ceiling_z + floor_thickness, tex_ceiling),
+            wall_a,
+            wall_b,
+        ))
 
-        f.write('}\n')
+    def _write_brushes(self, out, brushes):
+        """Append a list of planned (x1, y1, z1, x2, y2, z2, texture) brushes"""
+        out.extend(itertools.starmap(_format_brush, brushes))
 
 
 def main():
@@ -683,6 +702,9 @@ def main():
 
     args = parser.parse_args()
 
+    # Progress messages go to the console alongside the summary below
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+
     generator = QuakeMapGenerator2(
         theme=args.theme,
         difficulty=args.difficulty,
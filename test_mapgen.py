@@ -0,0 +1,59 @@
+"""Tests for mapgen.py (QuakeDungeonGenerator)"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from mapgen import QuakeDungeonGenerator
+
+
+class LayoutCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.cache_dir = os.path.join(self.tmpdir.name, 'cache')
+
+    def _export(self, name, cache_dir):
+        filename = os.path.join(self.tmpdir.name, name)
+        generator = QuakeDungeonGenerator(grid_size=16, num_rooms=40)
+        with contextlib.redirect_stdout(io.StringIO()):
+            generator.generate(seed=3, cache_dir=cache_dir)
+            generator.export_map(filename)
+        with open(filename, 'rb') as f:
+            return f.read()
+
+    def test_cache_miss_matches_no_cache(self):
+        self.assertEqual(self._export('miss.map', self.cache_dir),
+                         self._export('plain.map', None))
+
+    def test_cache_hit_matches_miss(self):
+        miss = self._export('miss.map', self.cache_dir)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        hit = self._export('hit.map', self.cache_dir)
+        self.assertEqual(miss, hit)
+
+    def test_unreadable_cache_is_a_miss(self):
+        miss = self._export('miss.map', self.cache_dir)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'wb') as f:
+                f.write(b'truncated')
+        self.assertEqual(self._export('again.map', self.cache_dir), miss)
+
+
+class EntityPoolTest(unittest.TestCase):
+    def test_empty_category_is_skipped(self):
+        generator = QuakeDungeonGenerator(grid_size=16, num_rooms=40)
+        generator.entity_pools['armor'] = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'test.map')
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.generate(seed=3)
+                generator.export_map(filename)
+            with open(filename) as f:
+                self.assertNotIn('item_armor', f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+"""Tests for mapgen2.py (QuakeMapGenerator2)"""
+
+import os
+import random
+import tempfile
+import unittest
+
+from mapgen2 import QuakeMapGenerator2
+
+
+class MapFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_non_ascii_wad_path(self):
+        wad_path = 'C:/Users/José/quake/id.wad'
+        filename = os.path.join(self.tmpdir.name, 'test.map')
+
+        random.seed(1)
+        QuakeMapGenerator2(wad_path=wad_path).generate_map(filename)
+
+        with open(filename, encoding='utf-8') as f:
+            self.assertIn('"wad" "%s"' % wad_path, f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()